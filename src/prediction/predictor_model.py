@@ -1,21 +1,438 @@
+import atexit
+import multiprocessing
+import multiprocessing.pool
 import os
+import threading
 import warnings
-import joblib
+from dataclasses import dataclass
 import numpy as np
 import pandas as pd
-from typing import Optional, Union, List
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
 from darts.models.forecasting.tbats_model import TBATS
 from darts import TimeSeries
+from numba import njit, prange
+from data_models.schema_validator import TimeDataType
+from logger import get_logger
 from schema.data_schema import ForecastingSchema
 from sklearn.exceptions import NotFittedError
-from multiprocessing import cpu_count, Pool
+from threadpoolctl import threadpool_limits
+from utils import read_json_as_dict, save_json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import cpu_count
+from multiprocessing.shared_memory import SharedMemory
 
 warnings.filterwarnings("ignore")
-PREDICTOR_FILE_NAME = "predictor.joblib"
+logger = get_logger(task_name=__name__)
+MANIFEST_FILE_NAME = "manifest.json"
+STATES_FILE_NAME = "forecast_states.npy"
+STATES_INDEX_FILE_NAME = "forecast_states_index.npz"
 
 # Determine the number of CPUs available
-CPUS_TO_USE = max(1, cpu_count() - 1) # spare one CPU for other tasks
-NUM_CPUS_PER_BATCH = 1    # Number of CPUs each batch can use
+CPUS_TO_USE = cpu_count()
+
+# Pandas aliases of the schema frequencies that have a fixed step
+FREQUENCY_ALIASES = {"SECONDLY": "s", "MINUTELY": "min", "HOURLY": "h", "DAILY": "D"}
+
+# Environment variables controlling the thread count of BLAS/OpenMP libraries
+BLAS_THREADS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# Worker pool shared by all fit calls, created lazily on first use
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> Union[multiprocessing.pool.Pool, ProcessPoolExecutor]:
+    """Return the worker pool shared across fit calls, creating it on first use.
+
+    A `fork` (or `forkserver`) Pool is used where available so that workers
+    don't re-import numpy/pandas/darts on startup. On platforms supporting
+    neither (i.e. Windows), a ProcessPoolExecutor is used instead.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            start_methods = multiprocessing.get_all_start_methods()
+            if "fork" in start_methods:
+                _POOL = multiprocessing.get_context("fork").Pool(
+                    CPUS_TO_USE, initializer=_init_worker
+                )
+            elif "forkserver" in start_methods:
+                _POOL = multiprocessing.get_context("forkserver").Pool(
+                    CPUS_TO_USE, initializer=_init_worker
+                )
+            else:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=CPUS_TO_USE, initializer=_init_worker
+                )
+            atexit.register(_close_pool)
+    return _POOL
+
+
+def _init_worker() -> None:
+    """Limit each pool worker to a single BLAS/OpenMP thread.
+
+    The pool already runs one worker per CPU, so letting each worker's linear
+    algebra use all CPUs as well would oversubscribe the machine.
+    """
+    for var in BLAS_THREADS_ENV_VARS:
+        os.environ[var] = "1"
+    # Environment variables are only read when BLAS is loaded, which has already
+    # happened in forked workers, so also limit the thread pools at runtime.
+    threadpool_limits(limits=1)
+
+
+def _close_pool() -> None:
+    """Shut down the shared worker pool, if it was created."""
+    global _POOL
+    with _POOL_LOCK:
+        if isinstance(_POOL, ProcessPoolExecutor):
+            _POOL.shutdown(wait=True)
+        elif _POOL is not None:
+            _POOL.close()
+            _POOL.join()
+        _POOL = None
+
+
+def _imap_unordered(func, iterable) -> Iterator:
+    """Apply `func` to each item of `iterable` using the shared pool.
+
+    Items are handed out one at a time, so an idle worker picks up the next item
+    as soon as it finishes its current one. Results are yielded in completion order.
+    """
+    pool = _get_pool()
+    if isinstance(pool, ProcessPoolExecutor):
+        futures = [pool.submit(func, item) for item in iterable]
+        for future in as_completed(futures):
+            yield future.result()
+    else:
+        yield from pool.imap_unordered(func, iterable, chunksize=1)
+
+
+class SharedArrayRef(NamedTuple):
+    """Location of an array within a shared memory block."""
+
+    name: str
+    dtype: str
+    start: int
+    stop: int
+
+
+def _to_shared_memory(
+    arrays: List[np.ndarray],
+) -> Tuple[SharedMemory, List[SharedArrayRef]]:
+    """Copy arrays of the same dtype, one after the other, into a new shared memory block.
+
+    Args:
+        arrays (List[np.ndarray]): The arrays to share.
+    Returns:
+        Tuple: The shared memory block, which the caller must close and unlink
+            once done, and the reference of each array within it.
+    """
+    dtype = arrays[0].dtype
+    total_length = sum(len(array) for array in arrays)
+    block = SharedMemory(create=True, size=max(1, total_length * dtype.itemsize))
+    buffer = np.ndarray(total_length, dtype=dtype, buffer=block.buf)
+    refs = []
+    offset = 0
+    for array in arrays:
+        buffer[offset : offset + len(array)] = array
+        refs.append(SharedArrayRef(block.name, dtype.str, offset, offset + len(array)))
+        offset += len(array)
+    del buffer
+    return block, refs
+
+
+def _from_shared_memory(ref: SharedArrayRef) -> np.ndarray:
+    """Read a copy of an array placed in shared memory by `_to_shared_memory`."""
+    block = SharedMemory(name=ref.name)
+    array = np.ndarray(ref.stop, dtype=ref.dtype, buffer=block.buf)[
+        ref.start : ref.stop
+    ].copy()
+    block.close()
+    return array
+
+
+def _group_rows_by_id(
+    data: pd.DataFrame, data_schema: ForecastingSchema
+) -> Tuple[List, List[np.ndarray]]:
+    """Find the row positions of each series in the data.
+
+    Ids are sorted the same way in fit and predict, and the rows of each series
+    are ordered by time. The row positions can be used with `ndarray.take` to
+    extract a series from a column without going through pandas groupby.
+
+    Args:
+        data (pd.DataFrame): Data containing the id and time columns.
+        data_schema (ForecastingSchema): Schema of the data.
+    Returns:
+        Tuple: The series ids and the row positions of each series.
+    """
+    id_codes, ids = pd.factorize(data[data_schema.id_col], sort=True)
+    time_codes, _ = pd.factorize(data[data_schema.time_col], sort=True)
+    order = np.lexsort((time_codes, id_codes))
+    starts = np.r_[0, np.flatnonzero(np.diff(id_codes[order])) + 1, len(order)]
+    rows_by_id = [order[starts[i] : starts[i + 1]] for i in range(len(ids))]
+    return ids.tolist(), rows_by_id
+
+
+def _make_time_index(
+    times: np.ndarray, time_col_dtype: str, frequency: str, id_=None
+) -> Union[pd.DatetimeIndex, pd.RangeIndex]:
+    """Build the darts-compatible time index of a series from its time values.
+
+    Series are sorted, so when the step is known the index is generated from
+    the first time value, which spares darts from inferring the frequency. The
+    generated index is checked against the time values, so that series with
+    missing or irregular time steps are rejected rather than relabelled.
+
+    Raises:
+        ValueError: If the time values of the series aren't regularly spaced.
+    """
+    if time_col_dtype == TimeDataType.INT:
+        step = int(times[1] - times[0]) if len(times) > 1 else 1
+        index = pd.RangeIndex(
+            start=int(times[0]), stop=int(times[-1]) + step, step=step
+        )
+    elif frequency in FREQUENCY_ALIASES:
+        index = pd.date_range(
+            start=times[0], periods=len(times), freq=FREQUENCY_ALIASES[frequency]
+        )
+    else:
+        return pd.DatetimeIndex(times)
+    if len(index) != len(times) or not np.array_equal(index.to_numpy(), times):
+        raise ValueError(
+            f"The time values of series {id_!r} are not regularly spaced; "
+            "missing time steps must be filled in before fitting."
+        )
+    return index
+
+
+def _fit_one(args: Tuple) -> Tuple:
+    """Fit a TBATS model to one series.
+
+    Args:
+        args (Tuple): The series as a (times, values) pair of arrays (or of
+            references to them in shared memory), its id, the time column data
+            type and frequency from the schema, and the TBATS keyword arguments.
+            Only these are shipped to workers, rather than the whole schema.
+    Returns:
+        Tuple: The series id and the forecast state of its fitted model.
+    """
+    (times, values), id_, time_col_dtype, frequency, model_kwargs = args
+    if isinstance(times, SharedArrayRef):
+        times, values = _from_shared_memory(times), _from_shared_memory(values)
+    return id_, _fit_on_series(
+        times, values, time_col_dtype, frequency, model_kwargs, id_
+    )
+
+
+def _fit_on_series(
+    times: np.ndarray,
+    values: np.ndarray,
+    time_col_dtype: str,
+    frequency: str,
+    model_kwargs: dict,
+    id_=None,
+) -> "ForecastState":
+    """Fit TBATS model to given individual series of data"""
+    model = TBATS(**model_kwargs)
+    series = TimeSeries.from_times_and_values(
+        _make_time_index(times, time_col_dtype, frequency, id_),
+        values,
+        fill_missing_dates=False,
+    )
+    model.fit(series)
+    return ForecastState.from_fitted_model(model)
+
+
+@dataclass
+class ForecastState:
+    """The parts of a fitted TBATS model needed to forecast it.
+
+    TBATS is a linear state space model: forecasts are obtained by rolling the
+    last state of the training series forward with x_t = F x_{t-1} and reading
+    y_t = w' x_{t-1}, then undoing the Box-Cox transformation if one was used.
+    The smoothing, trend, damping, seasonal and ARMA parameters are all encoded
+    in F and w, so the training series and the rest of the model aren't kept.
+    States are forecast, many at once, with `_forecast_states`.
+    """
+
+    transition: np.ndarray  # F
+    observation: np.ndarray  # w
+    last_state: np.ndarray  # x
+    box_cox_lambda: Optional[float] = None
+
+    @classmethod
+    def from_fitted_model(cls, model: TBATS) -> "ForecastState":
+        """Extract the forecast state of a fitted darts TBATS model."""
+        fitted = model.model
+        params = fitted.params
+        return cls(
+            transition=fitted.matrix.make_F_matrix(),
+            observation=fitted.matrix.make_w_vector(),
+            last_state=fitted.x_last,
+            box_cox_lambda=(
+                params.box_cox_lambda if params.components.use_box_cox else None
+            ),
+        )
+
+
+class PackedStates(NamedTuple):
+    """The forecast states of many series, concatenated into flat arrays.
+
+    Transition matrices are flattened row-major. The observation vector and last
+    state of series k span state_offsets[k]:state_offsets[k+1], and its transition
+    matrix matrix_offsets[k]:matrix_offsets[k+1].
+    """
+
+    transitions: np.ndarray
+    observations: np.ndarray
+    last_states: np.ndarray
+    state_offsets: np.ndarray
+    matrix_offsets: np.ndarray
+
+
+def _state_offsets(dims: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets of the states and transition matrices of the given dimensions."""
+    dims = np.asarray(dims, dtype=np.int64)
+    state_offsets = np.concatenate(([0], np.cumsum(dims)))
+    matrix_offsets = np.concatenate(([0], np.cumsum(dims * dims)))
+    return state_offsets, matrix_offsets
+
+
+def _pack_states(states: List[ForecastState]) -> PackedStates:
+    """Concatenate the arrays of many forecast states into flat arrays."""
+    state_offsets, matrix_offsets = _state_offsets(
+        [len(state.last_state) for state in states]
+    )
+    return PackedStates(
+        transitions=np.concatenate(
+            [s.transition.ravel() for s in states], dtype=np.float64
+        ),
+        observations=np.concatenate([s.observation for s in states], dtype=np.float64),
+        last_states=np.concatenate([s.last_state for s in states], dtype=np.float64),
+        state_offsets=state_offsets,
+        matrix_offsets=matrix_offsets,
+    )
+
+
+def _unpack_states(
+    packed: PackedStates, box_cox_lambdas: np.ndarray
+) -> List[ForecastState]:
+    """Split packed forecast states back into one state per series.
+
+    The arrays of each state are views into the packed arrays, not copies.
+    Series without a Box-Cox transformation have a NaN lambda.
+    """
+    states = []
+    for k, lam in enumerate(box_cox_lambdas):
+        start, stop = packed.state_offsets[k], packed.state_offsets[k + 1]
+        dim = stop - start
+        states.append(
+            ForecastState(
+                transition=packed.transitions[
+                    packed.matrix_offsets[k] : packed.matrix_offsets[k + 1]
+                ].reshape((dim, dim)),
+                observation=packed.observations[start:stop],
+                last_state=packed.last_states[start:stop],
+                box_cox_lambda=None if np.isnan(lam) else float(lam),
+            )
+        )
+    return states
+
+
+def _forecast_states(states: List[ForecastState], horizons: List[int]) -> np.ndarray:
+    """Forecast many series at once, in parallel across series.
+
+    Args:
+        states (List[ForecastState]): The forecast state of each series.
+        horizons (List[int]): The number of steps to forecast for each series.
+    Returns:
+        np.ndarray: The forecasts of all series, one after the other.
+    """
+    if not states:
+        return np.empty(0, dtype=np.float64)
+    packed = _pack_states(states)
+    out_offsets = np.concatenate(([0], np.cumsum(horizons, dtype=np.int64)))
+    forecasts = np.empty(out_offsets[-1], dtype=np.float64)
+    _forecast_many(
+        packed.transitions,
+        packed.observations,
+        packed.last_states,
+        packed.state_offsets,
+        packed.matrix_offsets,
+        forecasts,
+        out_offsets,
+    )
+    for i, state in enumerate(states):
+        if state.box_cox_lambda is not None:
+            start, stop = out_offsets[i], out_offsets[i + 1]
+            forecasts[start:stop] = _inv_box_cox(
+                forecasts[start:stop], state.box_cox_lambda
+            )
+    return forecasts
+
+
+@njit(cache=True, fastmath=True)
+def _state_space_forecast(
+    transition: np.ndarray,
+    observation: np.ndarray,
+    state: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """Roll `state` forward with `transition`, writing w'x at each step into `out`."""
+    dim = state.shape[0]
+    x = state.copy()
+    next_x = np.empty(dim)
+    for t in range(out.shape[0]):
+        y = 0.0
+        for i in range(dim):
+            y += observation[i] * x[i]
+        out[t] = y
+        for i in range(dim):
+            acc = 0.0
+            for j in range(dim):
+                acc += transition[i, j] * x[j]
+            next_x[i] = acc
+        x, next_x = next_x, x
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _forecast_many(
+    transitions: np.ndarray,
+    observations: np.ndarray,
+    states: np.ndarray,
+    state_offsets: np.ndarray,
+    matrix_offsets: np.ndarray,
+    out: np.ndarray,
+    out_offsets: np.ndarray,
+) -> None:
+    """Run `_state_space_forecast` for many series, in parallel across series.
+
+    The arrays of all series are concatenated, with transition matrices flattened
+    row-major. The state of series k spans state_offsets[k]:state_offsets[k+1],
+    its matrix matrix_offsets[k]:matrix_offsets[k+1] and its forecast
+    out_offsets[k]:out_offsets[k+1].
+    """
+    for k in prange(len(state_offsets) - 1):
+        start, stop = state_offsets[k], state_offsets[k + 1]
+        dim = stop - start
+        _state_space_forecast(
+            transitions[matrix_offsets[k] : matrix_offsets[k + 1]].reshape((dim, dim)),
+            observations[start:stop],
+            states[start:stop],
+            out[out_offsets[k] : out_offsets[k + 1]],
+        )
+
+
+def _inv_box_cox(values: np.ndarray, lam: float) -> np.ndarray:
+    """Invert the Box-Cox transformation, clipping values that have no inverse."""
+    if np.isclose(0.0, lam):
+        return np.exp(values)
+    if lam < 0:
+        values = np.minimum(values, -1 / lam)
+    transformed = values * lam + 1
+    return np.sign(transformed) * np.abs(transformed) ** (1 / lam)
 
 
 class Forecaster:
@@ -23,6 +440,11 @@ class Forecaster:
 
     This class provides a consistent interface that can be used with other
     Forecaster models.
+
+    Series are fitted in parallel across the shared worker pool, which is the
+    only parallel layer: each TBATS model runs its own candidate search with
+    `n_jobs=1` so that workers don't fork nested pools. Only the forecast state
+    of each fitted model is kept, in `models`, keyed by series id.
     """
 
     model_name = "TBATS Forecaster"
@@ -36,7 +458,7 @@ class Forecaster:
         use_trend: Optional[bool] = None,
         use_damped_trend: Optional[bool] = None,
         seasonal_periods: Union[str, List, None] = "freq",
-        use_arma_errors: Optional[bool] = True,
+        use_arma_errors: Optional[bool] = False,
         random_state: int = 0,
     ):
         """Construct a new TBATS Forecaster
@@ -55,6 +477,8 @@ class Forecaster:
                 When None both cases shall be considered and better is selected by AIC.
 
             box_cox_bounds (Tuple): Minimal and maximal Box-Cox parameter values.
+                To skip the search for the Box-Cox parameter, estimate it beforehand
+                (e.g. on a sample of the series) and pass it as both bounds: (lam, lam).
 
             use_trend (Optional[bool]): Indicates whether to include a trend or not.
                 When None, both cases shall be considered and the better one is selected by AIC.
@@ -66,10 +490,12 @@ class Forecaster:
                 TTBATS accepts int and float values here. TBATS accepts only int values.
                 When None or empty array, non-seasonal model shall be fitted.
                 If set to "freq", a single “naive” seasonality based on the series frequency will be used (e.g. [12] for monthly series).
-                In this latter case, the seasonality will be recomputed every time the model is fit.
+                In this latter case, the seasonality will be recomputed every time the model is fit,
+                once for all series.
 
             use_arma_errors (Optional[bool]): When True TBATS will try to improve the model by modelling residuals with ARMA.
                 Best model will be selected by AIC. If False, ARMA residuals modeling will not be considered.
+                Disabled by default since considering ARMA residuals roughly doubles the fitting time.
 
             random_state (int): Sets the underlying random seed at model initialization time.
         """
@@ -96,72 +522,74 @@ class Forecaster:
         data_schema: ForecastingSchema,
     ) -> None:
         np.random.seed(self.random_state)
-        groups_by_ids = history.groupby(data_schema.id_col)
-        all_ids = list(groups_by_ids.groups.keys())
-        all_series = [
-            groups_by_ids.get_group(id_).drop(columns=data_schema.id_col)
-            for id_ in all_ids
-        ]
-
-        # Prepare batches of series to be processed in parallel
-        num_parallel_batches = CPUS_TO_USE // NUM_CPUS_PER_BATCH
-        if len(all_ids) <= num_parallel_batches:
-            series_per_batch = 1
+        all_ids, rows_by_id = _group_rows_by_id(history, data_schema)
+        if self.history_length:
+            # truncate here so that only the used history is shipped to workers
+            rows_by_id = [rows[-self.history_length :] for rows in rows_by_id]
+        time_values = history[data_schema.time_col]
+        if data_schema.time_col_dtype != TimeDataType.INT:
+            # parse dates once for all series rather than once per series
+            time_values = pd.to_datetime(time_values)
+        time_values = time_values.to_numpy()
+        target_values = history[data_schema.target].to_numpy(dtype=np.float64)
+        all_times = [time_values.take(rows) for rows in rows_by_id]
+        all_values = [target_values.take(rows) for rows in rows_by_id]
+
+        # A single TBATS fit takes seconds, far more than starting the pool, so
+        # only skip the pool when it could not run anything in parallel
+        shared_blocks = []
+        if len(all_ids) == 1 or CPUS_TO_USE == 1:
+            logger.info(f"Fitting {len(all_ids)} series in the main process.")
+            all_series = list(zip(all_times, all_values))
+            imap = map
         else:
-            series_per_batch = 1 + (len(all_ids) // num_parallel_batches)
-        series_batches = [
-            all_series[i:i + series_per_batch]
-            for i in range(0, len(all_series), series_per_batch)
-        ]
-        id_batches = [
-            all_ids[i:i + series_per_batch]
-            for i in range(0, len(all_ids), series_per_batch)
-        ]
-
-        # Use multiprocessing to fit models in parallel
-        with Pool(processes=len(series_batches)) as pool:
-            results = pool.starmap(
-                self.fit_batch_of_series,
-                zip(series_batches, id_batches, [data_schema] * len(series_batches))
+            # Workers read the series from shared memory rather than receiving
+            # pickled copies of them
+            times_block, times_refs = _to_shared_memory(all_times)
+            values_block, values_refs = _to_shared_memory(all_values)
+            shared_blocks = [times_block, values_block]
+            all_series = list(zip(times_refs, values_refs))
+            imap = _imap_unordered
+
+        model_kwargs = self._get_model_kwargs()
+        fit_args = (
+            (
+                all_series[i],
+                all_ids[i],
+                data_schema.time_col_dtype,
+                data_schema.frequency,
+                model_kwargs,
             )
+            for i in range(len(all_ids))
+        )
+        self.models = {}
+        try:
+            for id_, state in imap(_fit_one, fit_args):
+                self.models[id_] = state
+        finally:
+            for block in shared_blocks:
+                block.close()
+                block.unlink()
 
-        # Flatten results and update the models dictionary
-        self.models = {id: model for batch in results for id, model in batch.items()}       
-        
         self.all_ids = all_ids
         self._is_trained = True
         self.data_schema = data_schema
 
-    def fit_batch_of_series(self, series_batch, ids_batch, data_schema):
-        models = {}
-        for series, id in zip(series_batch, ids_batch):
-            if self.history_length:
-                series = series[-self.history_length:]
-            model = self._fit_on_series(history=series, data_schema=data_schema)
-            models[id] = model
-        return models
-
-    def _fit_on_series(self, history: pd.DataFrame, data_schema: ForecastingSchema):
-        """Fit TBATS model to given individual series of data"""
-        model = TBATS(
-            use_box_cox=self.use_box_cox,
-            box_cox_bounds=self.box_cox_bounds,
-            use_trend=self.use_trend,
-            use_damped_trend=self.use_damped_trend,
-            seasonal_periods=self.seasonal_periods,
-            use_arma_errors=self.use_arma_errors,
-            show_warnings=False,
-            n_jobs=NUM_CPUS_PER_BATCH,
-            multiprocessing_start_method="spawn",
-            random_state=self.random_state,
-        )
-
-        series = TimeSeries.from_dataframe(
-            history, data_schema.time_col, data_schema.target
-        )
-        model.fit(series)
-
-        return model
+    def _get_hyperparameters(self) -> dict:
+        """Constructor arguments needed to recreate this Forecaster when loading it."""
+        return {
+            "use_box_cox": self.use_box_cox,
+            "box_cox_bounds": self.box_cox_bounds,
+            "use_trend": self.use_trend,
+            "use_damped_trend": self.use_damped_trend,
+            "seasonal_periods": self.seasonal_periods,
+            "use_arma_errors": self.use_arma_errors,
+            "random_state": self.random_state,
+        }
+
+    def _get_model_kwargs(self) -> dict:
+        """Keyword arguments used to construct the TBATS model of each series."""
+        return {**self._get_hyperparameters(), "show_warnings": False, "n_jobs": 1}
 
     def predict(self, test_data: pd.DataFrame, prediction_col_name: str) -> np.ndarray:
         """Make the forecast of given length.
@@ -175,62 +603,113 @@ class Forecaster:
         if not self._is_trained:
             raise NotFittedError("Model is not fitted yet.")
 
-        groups_by_ids = test_data.groupby(self.data_schema.id_col)
-        all_series = [
-            groups_by_ids.get_group(id_).drop(columns=self.data_schema.id_col)
-            for id_ in self.all_ids
-        ]
-        # forecast one series at a time
-        all_forecasts = []
-        for id_, series_df in zip(self.all_ids, all_series):
-            forecast = self._predict_on_series(key_and_future_df=(id_, series_df))
-            forecast.insert(0, self.data_schema.id_col, id_)
-            all_forecasts.append(forecast)
-
-        # concatenate all series' forecasts into a single dataframe
-        all_forecasts = pd.concat(all_forecasts, axis=0, ignore_index=True)
-
-        all_forecasts.rename(
-            columns={self.data_schema.target: prediction_col_name}, inplace=True
-        )
-        return all_forecasts
+        id_col = self.data_schema.id_col
+        time_col = self.data_schema.time_col
 
-    def _predict_on_series(self, key_and_future_df):
-        """Make forecast on given individual series of data"""
-        key, future_df = key_and_future_df
+        # ids without a model weren't found in history, so we can't forecast them
+        is_known = test_data[id_col].isin(self.all_ids)
+        if not is_known.all():
+            unknown_ids = test_data.loc[~is_known, id_col].unique().tolist()
+            logger.warning(
+                f"Skipping ids not found in training data: {unknown_ids}. "
+                "No forecasts will be made for them."
+            )
+            test_data = test_data[is_known]
 
-        if self.models.get(key) is not None:
-            forecast = self.models[key].predict(len(future_df))
-            forecast_df = forecast.pd_dataframe()
-            forecast = forecast_df[self.data_schema.target]
-            future_df[self.data_schema.target] = forecast.values
+        test_ids, rows_by_id = _group_rows_by_id(test_data, self.data_schema)
+        out_preds = _forecast_states(
+            [self.models[id_] for id_ in test_ids], [len(rows) for rows in rows_by_id]
+        )
 
-        else:
-            # no model found - key wasnt found in history, so cant forecast for it.
-            future_df = None
+        # gather the ids and times of the forecast rows, in the same order
+        out_rows = np.concatenate(rows_by_id or [np.empty(0, dtype=np.int64)])
+        out_ids = test_data[id_col].to_numpy().take(out_rows)
+        out_times = test_data[time_col].to_numpy().take(out_rows)
 
-        return future_df
+        return pd.DataFrame(
+            {id_col: out_ids, time_col: out_times, prediction_col_name: out_preds},
+            copy=False,
+        )
 
     def save(self, model_dir_path: str) -> None:
         """Save the Forecaster to disk.
 
+        The forecast states of all series are packed into a single flat array,
+        saved uncompressed so that it can be memory-mapped on load, next to a
+        small index of their dimensions and Box-Cox lambdas and a JSON manifest
+        holding the schema, hyperparameters and series ids.
+
         Args:
             model_dir_path (str): Dir path to which to save the model.
         """
         if not self._is_trained:
             raise NotFittedError("Model is not fitted yet.")
-        joblib.dump(self, os.path.join(model_dir_path, PREDICTOR_FILE_NAME))
+        os.makedirs(model_dir_path, exist_ok=True)
+        states = [self.models[id_] for id_ in self.all_ids]
+        packed = _pack_states(states)
+        np.save(
+            os.path.join(model_dir_path, STATES_FILE_NAME),
+            np.concatenate(
+                (packed.transitions, packed.observations, packed.last_states)
+            ),
+        )
+        np.savez(
+            os.path.join(model_dir_path, STATES_INDEX_FILE_NAME),
+            dims=np.diff(packed.state_offsets),
+            box_cox_lambdas=np.array(
+                [
+                    np.nan if state.box_cox_lambda is None else state.box_cox_lambda
+                    for state in states
+                ],
+                dtype=np.float64,
+            ),
+        )
+        manifest = {
+            "data_schema": self.data_schema.schema,
+            "hyperparameters": self._get_hyperparameters(),
+            "history_length": self.history_length,
+            "all_ids": self.all_ids,
+        }
+        save_json(os.path.join(model_dir_path, MANIFEST_FILE_NAME), manifest)
 
     @classmethod
     def load(cls, model_dir_path: str) -> "Forecaster":
         """Load the Forecaster from disk.
 
+        The packed forecast states are memory-mapped read-only rather than read
+        into memory, so processes loading the same model share their pages. All
+        series are views into that one mapping.
+
         Args:
             model_dir_path (str): Dir path to the saved model.
         Returns:
             Forecaster: A new instance of the loaded Forecaster.
         """
-        model = joblib.load(os.path.join(model_dir_path, PREDICTOR_FILE_NAME))
+        manifest = read_json_as_dict(os.path.join(model_dir_path, MANIFEST_FILE_NAME))
+        hyperparameters = manifest["hyperparameters"]
+        hyperparameters["box_cox_bounds"] = tuple(hyperparameters["box_cox_bounds"])
+        model = cls(
+            data_schema=ForecastingSchema(manifest["data_schema"]), **hyperparameters
+        )
+        model.history_length = manifest["history_length"]
+        model.all_ids = manifest["all_ids"]
+
+        with np.load(os.path.join(model_dir_path, STATES_INDEX_FILE_NAME)) as index:
+            dims = index["dims"]
+            box_cox_lambdas = index["box_cox_lambdas"]
+        state_offsets, matrix_offsets = _state_offsets(dims)
+        values = np.load(os.path.join(model_dir_path, STATES_FILE_NAME), mmap_mode="r")
+        observations_start = matrix_offsets[-1]
+        last_states_start = observations_start + state_offsets[-1]
+        packed = PackedStates(
+            transitions=values[:observations_start],
+            observations=values[observations_start:last_states_start],
+            last_states=values[last_states_start:],
+            state_offsets=state_offsets,
+            matrix_offsets=matrix_offsets,
+        )
+        model.models = dict(zip(model.all_ids, _unpack_states(packed, box_cox_lambdas)))
+        model._is_trained = True
         return model
 
     def __str__(self):